@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -81,3 +82,73 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Authentication settings
 LOGIN_REDIRECT_URL = 'resume_list'
 LOGOUT_REDIRECT_URL = 'home'
+
+# PDF generation admission control (see resumes/throttling.py). RATE requests
+# are allowed per fixed PERIOD window, so up to 2 * RATE can get through around
+# a window boundary. Public share link downloads are limited per link, since
+# behind a CDN every cache miss comes from a few edge addresses. 'link+client'
+# also splits each link's allowance per client, read from CLIENT_IP_HEADER of
+# which the last TRUSTED_PROXIES entries are written by our own proxies (e.g.
+# HTTP_X_FORWARDED_FOR and 2 behind a CDN and a load balancer).
+PDF_THROTTLE = {
+    'RATE': 10,
+    'PERIOD': 60,
+    'MAX_CONCURRENT': 4,
+    'CACHE': 'default',
+    'SHARE_KEY': 'link',
+    'CLIENT_IP_HEADER': 'REMOTE_ADDR',
+    'TRUSTED_PROXIES': 1,
+}
+
+# The PDF rate limit and monitoring counters must live in a cache shared by
+# every worker with an atomic incr(). The local-memory default is per process
+# and only suits development; set REDIS_URL (requires the redis package) in
+# production.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
+# Password hashing. New hashes use scrypt with the parameters below; older
+# PBKDF2 hashes still verify and are upgraded transparently on login.
+PASSWORD_HASHERS = [
+    'resumes.hashers.TunedScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+PASSWORD_SCRYPT = {
+    'WORK_FACTOR': 2 ** 14,
+    'BLOCK_SIZE': 8,
+    'PARALLELISM': 1,
+    'MAXMEM': 64 * 1024 * 1024,
+}
+
+# Compressed, byte-for-byte reproducible PDF output (see resumes/pdf.py)
+PDF_COMPACT_OUTPUT = True
+# How long browsers may reuse a downloaded PDF before revalidating its ETag
+PDF_CACHE_MAX_AGE = 3600
+
+# Public share links are cached with Cache-Control: public for this many
+# seconds, which also bounds how long a revoked link may still be served
+SHARE_CACHE_MAX_AGE = 300
+
+# Buffered activity log (see resumes/events.py)
+ACTIVITY_LOG = {
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 5,
+    'RETENTION_DAYS': 90,
+}
+
+# Account deletion purges related rows in batches of this size, in a
+# background thread when enabled, otherwise via purge_deleted_accounts
+ACCOUNT_PURGE_BATCH_SIZE = 200
+ACCOUNT_PURGE_IN_BACKGROUND = True
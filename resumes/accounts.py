@@ -0,0 +1,71 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import AccountDeletion, Resume, ShareLink, UserProfile
+
+logger = logging.getLogger(__name__)
+
+
+def get_purge_batch_size():
+    return getattr(settings, 'ACCOUNT_PURGE_BATCH_SIZE', 200)
+
+
+def request_account_deletion(user):
+    """Deactivate the account now and leave the heavy deletion to purge_account()."""
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        # Public links must stop working now, not when the purge gets to them
+        ShareLink.objects.filter(resume__owner=user, revoked_at__isnull=True).update(revoked_at=timezone.now())
+        deletion = AccountDeletion.objects.create(user=user)
+    if getattr(settings, 'ACCOUNT_PURGE_IN_BACKGROUND', True):
+        transaction.on_commit(lambda: start_background_purge(deletion.pk))
+    return deletion
+
+
+def purge_account(deletion, batch_size=None):
+    """Delete the user's data in short batched transactions, then the user."""
+    batch_size = batch_size or get_purge_batch_size()
+    user_id = deletion.user_id
+
+    while True:
+        pks = list(Resume.objects.filter(owner_id=user_id).values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        # Share links cascade and stored PDFs are removed by the post_delete signal
+        with transaction.atomic():
+            Resume.objects.filter(pk__in=pks).delete()
+
+    for profile in UserProfile.objects.filter(user_id=user_id):
+        if profile.profile_picture:
+            profile.profile_picture.delete(save=False)
+        profile.delete()
+
+    with transaction.atomic():
+        User.objects.filter(pk=user_id).delete()
+        deletion.completed_at = timezone.now()
+        deletion.save(update_fields=['completed_at'])
+
+
+def _purge_in_thread(deletion_pk):
+    try:
+        deletion = AccountDeletion.objects.get(pk=deletion_pk, completed_at__isnull=True)
+        purge_account(deletion)
+    except AccountDeletion.DoesNotExist:
+        pass
+    except Exception:
+        # Left incomplete; the purge_deleted_accounts command will retry it
+        logger.exception('Background purge of account deletion #%s failed', deletion_pk)
+    finally:
+        connection.close()
+
+
+def start_background_purge(deletion_pk):
+    thread = threading.Thread(target=_purge_in_thread, args=(deletion_pk,), daemon=True)
+    thread.start()
+    return thread
@@ -1,5 +1,9 @@
+import tempfile
+
 from django.contrib import admin
-from .models import Resume, UserProfile
+from django.http import FileResponse
+from .models import AccountDeletion, ActivityDailyRollup, ActivityEvent, Resume, ShareLink, UserProfile
+from .pdf import build_combined_pdf
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
@@ -10,3 +14,36 @@ class UserProfileAdmin(admin.ModelAdmin):
 class ResumeAdmin(admin.ModelAdmin):
     list_display = ('full_name', 'owner', 'email', 'updated_at')
     search_fields = ('full_name', 'email', 'owner__username')
+    actions = ['download_combined_pdf']
+
+    @admin.action(description='Download selected resumes as one PDF')
+    def download_combined_pdf(self, request, queryset):
+        queryset = queryset.order_by('full_name', 'pk')
+        toc_entries = queryset.values_list('pk', 'full_name').iterator(chunk_size=500)
+        resumes = queryset.defer('rendered_html').iterator(chunk_size=100)
+        # The finished PDF spills to disk past 10 MB; ReportLab itself still keeps
+        # every compressed page in memory until the build ends (see build_combined_pdf)
+        output = tempfile.SpooledTemporaryFile(max_size=10 * 1024 * 1024)
+        build_combined_pdf(toc_entries, resumes, output)
+        output.seek(0)
+        return FileResponse(output, as_attachment=True, filename='resume_packet.pdf', content_type='application/pdf')
+
+@admin.register(ShareLink)
+class ShareLinkAdmin(admin.ModelAdmin):
+    list_display = ('resume', 'created_at', 'expires_at', 'revoked_at')
+    search_fields = ('resume__full_name', 'resume__owner__username')
+
+@admin.register(ActivityEvent)
+class ActivityEventAdmin(admin.ModelAdmin):
+    list_display = ('event_type', 'user', 'resume_id', 'created_at')
+    list_filter = ('event_type',)
+    search_fields = ('user__username',)
+
+@admin.register(ActivityDailyRollup)
+class ActivityDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('day', 'user', 'event_type', 'count')
+    list_filter = ('event_type',)
+
+@admin.register(AccountDeletion)
+class AccountDeletionAdmin(admin.ModelAdmin):
+    list_display = ('user_id', 'requested_at', 'completed_at')
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 class ResumesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'resumes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .pdf import configure_reportlab
+        configure_reportlab()
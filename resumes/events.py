@@ -0,0 +1,90 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ActivityEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACTIVITY_LOG = {
+    'BATCH_SIZE': 100,      # flush once this many events are buffered
+    'FLUSH_INTERVAL': 5,    # ... or this many seconds after the first one
+    'RETENTION_DAYS': 90,   # raw events older than this are rolled up
+}
+
+
+def get_activity_config():
+    config = dict(DEFAULT_ACTIVITY_LOG)
+    config.update(getattr(settings, 'ACTIVITY_LOG', {}))
+    return config
+
+
+class EventBuffer:
+    """Collects ActivityEvent rows in process and writes them with bulk_create.
+
+    Writing in batches keeps hot paths such as PDF downloads from issuing an
+    INSERT (and taking SQLite's write lock) on every request. The buffer is
+    flushed when it holds BATCH_SIZE events, when the oldest event is
+    FLUSH_INTERVAL seconds old (checked as events arrive and at the end of
+    every request), and when the process exits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = []
+        self._oldest = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def _is_due(self, config):
+        return bool(self._events) and (
+            len(self._events) >= config['BATCH_SIZE']
+            or time.monotonic() - self._oldest >= config['FLUSH_INTERVAL']
+        )
+
+    def add(self, event):
+        with self._lock:
+            if not self._events:
+                self._oldest = time.monotonic()
+            self._events.append(event)
+        self.flush_if_due()
+
+    def flush_if_due(self):
+        with self._lock:
+            due = self._is_due(get_activity_config())
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            events, self._events = self._events, []
+            self._oldest = None
+        if events:
+            try:
+                ActivityEvent.objects.bulk_create(events, batch_size=500)
+            except Exception:
+                logger.exception('Failed to write %d activity events', len(events))
+        return len(events)
+
+
+event_buffer = EventBuffer()
+atexit.register(event_buffer.flush)
+
+
+def record_event(event_type, user=None, resume=None, **metadata):
+    event_buffer.add(ActivityEvent(
+        event_type=event_type,
+        user_id=user.pk if user is not None else None,
+        resume_id=resume.pk if resume is not None else None,
+        metadata=metadata,
+        created_at=timezone.now(),
+    ))
+
+
+def flush_events():
+    return event_buffer.flush()
@@ -0,0 +1,118 @@
+import json
+
+from .sections import SECTIONS_BY_KEY, iter_sections, section_entries
+
+DOCUMENT_SEPARATORS = {
+    'txt': '\n' + '=' * 72 + '\n\n',
+    'md': '\n---\n\n',
+}
+
+
+def iter_text(resume):
+    yield resume.full_name + '\n'
+    yield '=' * len(resume.full_name) + '\n'
+    for section, entries in iter_sections(resume):
+        yield '\n' + section.title.upper() + '\n'
+        for entry in entries:
+            yield ('- ' if section.bullet else '') + entry + '\n'
+
+
+def iter_markdown(resume):
+    yield f'# {resume.full_name}\n'
+    for section, entries in iter_sections(resume):
+        yield f'\n## {section.title}\n\n'
+        if section.bullet:
+            for entry in entries:
+                yield f'- {entry}\n'
+        else:
+            # Trailing double space keeps line breaks inside the paragraph
+            yield '  \n'.join(entry.replace('\n', '  \n') for entry in entries) + '\n'
+
+
+def _entries(resume, key):
+    return section_entries(resume, SECTIONS_BY_KEY[key])
+
+
+def _grouped(resume, key):
+    """Split "Title | Detail | Date" headers and their "- item" lines into groups."""
+    groups = []
+    for line in _entries(resume, key):
+        if line.startswith(('-', '•', '*')) and groups:
+            groups[-1][1].append(line.lstrip('-•* ').strip())
+        else:
+            groups.append(([part.strip() for part in line.split('|')], []))
+    return groups
+
+
+def _part(parts, index):
+    return parts[index] if len(parts) > index else ''
+
+
+def to_json_resume(resume):
+    """Map a Resume onto the JSON Resume schema (https://jsonresume.org/schema/)."""
+    profiles = [
+        {'network': network, 'url': url}
+        for network, url in (('LinkedIn', resume.linkedin), ('GitHub', resume.github))
+        if url
+    ]
+    languages = []
+    for line in _entries(resume, 'languages'):
+        language, _, fluency = line.partition(':')
+        languages.append({'language': language.strip(), 'fluency': fluency.strip()})
+
+    return {
+        'basics': {
+            'name': resume.full_name,
+            'email': resume.email,
+            'phone': resume.phone,
+            'url': resume.portfolio,
+            'summary': resume.summary,
+            'location': {'address': resume.address},
+            'profiles': profiles,
+        },
+        'work': [
+            {'name': _part(parts, 0), 'position': _part(parts, 1), 'startDate': _part(parts, 2), 'highlights': items}
+            for parts, items in _grouped(resume, 'experience')
+        ],
+        'education': [
+            {'studyType': _part(parts, 0), 'institution': _part(parts, 1), 'endDate': _part(parts, 2), 'courses': items}
+            for parts, items in _grouped(resume, 'education')
+        ],
+        'projects': [
+            {'name': _part(parts, 0), 'keywords': [k.strip() for k in _part(parts, 1).split(',') if k.strip()], 'highlights': items}
+            for parts, items in _grouped(resume, 'projects')
+        ],
+        'skills': [{'name': skill} for skill in _entries(resume, 'skills')],
+        'languages': languages,
+        'certificates': [{'name': line} for line in _entries(resume, 'certifications')],
+        'interests': [
+            {'name': interest.strip()}
+            for interest in resume.interests.replace('\n', ',').split(',') if interest.strip()
+        ],
+        'references': [{'reference': line} for line in _entries(resume, 'references')],
+        'meta': {'lastModified': resume.updated_at.isoformat()},
+    }
+
+
+def iter_json(resume):
+    yield json.dumps(to_json_resume(resume), ensure_ascii=False)
+
+
+EXPORT_FORMATS = {
+    'txt': (iter_text, 'text/plain; charset=utf-8'),
+    'md': (iter_markdown, 'text/markdown; charset=utf-8'),
+    'json': (iter_json, 'application/json'),
+}
+
+
+def stream_resumes(resumes, fmt):
+    """Stream many resumes as one document without holding them all in memory."""
+    render = EXPORT_FORMATS[fmt][0]
+    if fmt == 'json':
+        yield '['
+    for index, resume in enumerate(resumes):
+        if index:
+            yield ',' if fmt == 'json' else DOCUMENT_SEPARATORS[fmt]
+        yield from render(resume)
+    if fmt == 'json':
+        yield ']'
@@ -236,3 +236,14 @@ class CustomPasswordChangeForm(PasswordChangeForm):
         super().__init__(*args, **kwargs)
         for field in self.fields:
             self.fields[field].widget.attrs.update({'class': 'form-control'})
+
+class ShareLinkForm(forms.Form):
+    EXPIRY_CHOICES = [
+        ('', 'Never expires'),
+        ('1', 'Expires in 1 day'),
+        ('7', 'Expires in 7 days'),
+        ('30', 'Expires in 30 days'),
+    ]
+    expires_in = forms.ChoiceField(choices=EXPIRY_CHOICES, required=False, widget=forms.Select(attrs={
+        'class': 'form-select'
+    }))
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.contrib.auth.hashers import ScryptPasswordHasher
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """Scrypt hasher whose cost parameters come from settings.PASSWORD_SCRYPT.
+
+    Stored hashes created with different parameters report must_update(), so
+    Django rehashes them transparently the next time the user logs in.
+    """
+
+    def __init__(self):
+        params = getattr(settings, 'PASSWORD_SCRYPT', {})
+        self.work_factor = params.get('WORK_FACTOR', self.work_factor)
+        self.block_size = params.get('BLOCK_SIZE', self.block_size)
+        self.parallelism = params.get('PARALLELISM', self.parallelism)
+        self.maxmem = params.get('MAXMEM', self.maxmem)
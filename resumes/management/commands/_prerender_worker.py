@@ -0,0 +1,40 @@
+"""Pool worker functions for the prerender_pdfs command.
+
+Workers started with spawn (macOS, Windows) or forkserver import this module
+in a fresh interpreter to unpickle their tasks, so Django has to be set up
+before anything below touches the app registry. The leading underscore keeps
+Django from listing it as a command.
+"""
+import django
+from django.apps import apps
+
+if not apps.ready:
+    django.setup()
+
+from django.core.files.storage import default_storage  # noqa: E402
+from django.db import connections  # noqa: E402
+
+from resumes.pdf import build_resume_pdf, store_pdf, stored_pdf_name  # noqa: E402
+
+
+def init_worker():
+    # Forked workers must not share the parent's database connections
+    connections.close_all()
+
+
+def render_chunk(args):
+    resumes, force = args
+    rendered = skipped = 0
+    failed = []
+    for resume in resumes:
+        if not force and default_storage.exists(stored_pdf_name(resume)):
+            skipped += 1
+            continue
+        try:
+            store_pdf(resume, build_resume_pdf(resume))
+        except Exception as exc:
+            # One bad resume must not abort the run or pin the checkpoint
+            failed.append((resume.pk, f'{type(exc).__name__}: {exc}'))
+            continue
+        rendered += 1
+    return resumes[-1].pk, rendered, skipped, failed
@@ -0,0 +1,73 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth import login as auth_login
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+PASSWORD = 'Benchmark!Passw0rd'
+
+
+def _login_after_authenticate(request, user, backend=None):
+    # What signup did before: hash the password again in authenticate(), then log in
+    user = authenticate(request, username=user.username, password=PASSWORD)
+    auth_login(request, user)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the signup and login views end to end against a throwaway test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.stdout.write(f'hasher: {get_hasher().algorithm}')
+            new_signup = self._bench_signup('new', iterations)
+            # Same view, with the login step swapped back to authenticate() + login()
+            with mock.patch('resumes.views.login', _login_after_authenticate):
+                old_signup = self._bench_signup('old', iterations)
+            login = self._bench_login('new', iterations)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(
+            f'signup {new_signup:.1f}/s (was {old_signup:.1f}/s with authenticate(), '
+            f'{new_signup / old_signup:.2f}x)'
+        )
+        self.stdout.write(f'login {login:.1f}/s')
+
+    def _bench_signup(self, prefix, iterations):
+        client = Client()
+        start = time.perf_counter()
+        for index in range(iterations):
+            response = client.post('/signup/', {
+                'username': f'{prefix}{index}',
+                'email': f'{prefix}{index}@gmail.com',
+                'first_name': 'Bench',
+                'last_name': 'User',
+                'password1': PASSWORD,
+                'password2': PASSWORD,
+            })
+            if response.status_code != 302 or '_auth_user_id' not in client.session:
+                raise CommandError(f'Signup of {prefix}{index} did not log the user in')
+            client.logout()
+        return iterations / (time.perf_counter() - start)
+
+    def _bench_login(self, prefix, iterations):
+        client = Client()
+        start = time.perf_counter()
+        for index in range(iterations):
+            response = client.post('/login/', {'username': f'{prefix}{index}', 'password': PASSWORD})
+            if response.status_code != 302:
+                raise CommandError(f'Login of {prefix}{index} failed')
+            client.logout()
+        return iterations / (time.perf_counter() - start)
@@ -0,0 +1,51 @@
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from resumes.models import Resume
+from resumes.pdf import build_combined_pdf
+
+SAMPLE = {
+    'email': 'candidate@example.com',
+    'phone': '+1 (555) 123-4567',
+    'address': 'Springfield, IL 62701',
+    'linkedin': 'https://linkedin.com/in/candidate',
+    'summary': 'Engineer with a decade of experience shipping web applications. ' * 4,
+    'skills': 'Python, Django, PostgreSQL, JavaScript, Docker, AWS',
+    'languages': 'English: Native\nSpanish: Intermediate',
+    'experience': 'Acme Corp | Senior Developer | 2019-2024\n- Led a team of five\n- Cut page load time in half\n' * 3,
+    'education': 'BSc Computer Science | State University | 2014',
+    'certifications': 'AWS Certified Solutions Architect\nCertified Scrum Master',
+    'projects': 'Resume Builder | Django, ReportLab\n- Built PDF export',
+    'interests': 'Photography, Traveling',
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark combined PDF packet build time against packet size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='50,100,250,500',
+                            help='Comma separated packet sizes to build')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        now = timezone.now()
+        for size in sizes:
+            # Unsaved resumes keep the benchmark off the database
+            resumes = [
+                Resume(pk=index + 1, full_name=f'Candidate {index + 1}', updated_at=now, **SAMPLE)
+                for index in range(size)
+            ]
+            toc_entries = [(resume.pk, resume.full_name) for resume in resumes]
+            with tempfile.TemporaryFile() as output:
+                start = time.perf_counter()
+                pages = build_combined_pdf(toc_entries, resumes, output)
+                elapsed = time.perf_counter() - start
+                output_size = output.tell()
+            self.stdout.write(
+                f'{size} resumes: {elapsed:.2f}s ({size / elapsed:.1f} resumes/s), '
+                f'{pages} pages, {output_size / 1024:.0f} KiB'
+            )
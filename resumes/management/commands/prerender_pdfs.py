@@ -0,0 +1,131 @@
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils.dateparse import parse_datetime
+
+from resumes.models import Resume
+from resumes.pdf import PDF_TEMPLATE_VERSION, pdf_output_mode
+
+from ._prerender_worker import init_worker, render_chunk
+
+
+class Command(BaseCommand):
+    help = 'Pre-render stored resume PDFs in parallel, e.g. after a PDF template change'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunk-size', type=int, default=50,
+                            help='Resumes handed to a worker at a time')
+        parser.add_argument('--owner', help='Only render resumes owned by this username')
+        parser.add_argument('--updated-since', help='Only render resumes updated at or after this ISO datetime')
+        parser.add_argument('--force', action='store_true', help='Re-render even if a current PDF is stored')
+        parser.add_argument('--checkpoint', default=str(Path(settings.BASE_DIR) / '.prerender_pdfs.checkpoint'),
+                            help='File recording progress so an interrupted run can resume')
+        parser.add_argument('--restart', action='store_true', help='Ignore any existing checkpoint')
+
+    def handle(self, *args, **options):
+        checkpoint = Path(options['checkpoint'])
+        run_filters = {
+            'owner': options['owner'],
+            'updated_since': options['updated_since'],
+            'force': options['force'],
+        }
+        last_pk = 0 if options['restart'] else self._read_checkpoint(checkpoint, run_filters)
+
+        resumes = Resume.objects.defer('rendered_html').filter(pk__gt=last_pk).order_by('pk')
+        if options['owner']:
+            resumes = resumes.filter(owner__username=options['owner'])
+        if options['updated_since']:
+            updated_since = parse_datetime(options['updated_since'])
+            if updated_since is None:
+                raise CommandError('--updated-since must be an ISO datetime')
+            resumes = resumes.filter(updated_at__gte=updated_since)
+
+        if last_pk:
+            self.stdout.write(f'Resuming after resume #{last_pk}.')
+
+        chunk_size = options['chunk_size']
+        force = options['force']
+        rendered = skipped = 0
+        failed = []
+        start = time.perf_counter()
+
+        # The parent streams rows and hands them out; it must not fork with an open connection
+        connections.close_all()
+        with multiprocessing.Pool(options['workers'], initializer=init_worker) as pool:
+            # Rows are read here in the main thread (pool.imap would pull them
+            # from a helper thread with its own connection), with a bounded
+            # number of chunks in flight
+            pending = deque()
+            max_pending = options['workers'] * 2
+
+            def collect():
+                nonlocal rendered, skipped
+                # Results are taken in submission order, so the checkpoint only
+                # ever advances past finished work
+                chunk_last_pk, chunk_rendered, chunk_skipped, chunk_failed = pending.popleft().get()
+                rendered += chunk_rendered
+                skipped += chunk_skipped
+                failed.extend(chunk_failed)
+                self._write_checkpoint(checkpoint, chunk_last_pk, run_filters)
+
+            for chunk in self._chunks(resumes.iterator(chunk_size=chunk_size), chunk_size, force):
+                pending.append(pool.apply_async(render_chunk, (chunk,)))
+                if len(pending) >= max_pending:
+                    collect()
+            while pending:
+                collect()
+
+        elapsed = time.perf_counter() - start
+        if checkpoint.exists():
+            checkpoint.unlink()
+        rate = rendered / elapsed if elapsed else 0
+        for pk, error in failed:
+            self.stderr.write(f'Resume #{pk} failed: {error}')
+        summary = (
+            f'Rendered {rendered} PDF(s), skipped {skipped} up to date, failed {len(failed)}, '
+            f'in {elapsed:.1f}s ({rate:.1f} PDFs/s, {options["workers"]} worker(s)).'
+        )
+        self.stdout.write(self.style.WARNING(summary) if failed else self.style.SUCCESS(summary))
+
+    def _chunks(self, iterator, size, force):
+        chunk = []
+        for resume in iterator:
+            chunk.append(resume)
+            if len(chunk) >= size:
+                yield chunk, force
+                chunk = []
+        if chunk:
+            yield chunk, force
+
+    def _read_checkpoint(self, path, run_filters):
+        if not path.exists():
+            return 0
+        data = json.loads(path.read_text())
+        if data.get('template_version') != PDF_TEMPLATE_VERSION or data.get('output_mode') != pdf_output_mode():
+            # A checkpoint from an older template or output mode does not apply any more
+            return 0
+        if data.get('filters') != run_filters:
+            raise CommandError(
+                f'{path} was written by a run with different filters ({data.get("filters")}); '
+                'rerun with those filters to resume it, or pass --restart.'
+            )
+        return data['last_pk']
+
+    def _write_checkpoint(self, path, last_pk, run_filters):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({
+            'last_pk': last_pk,
+            'template_version': PDF_TEMPLATE_VERSION,
+            'output_mode': pdf_output_mode(),
+            'filters': run_filters,
+        }))
+        tmp.replace(path)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from resumes.accounts import get_purge_batch_size, purge_account
+from resumes.models import AccountDeletion
+
+
+class Command(BaseCommand):
+    help = 'Finish purging accounts whose deletion was requested but not completed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=get_purge_batch_size())
+
+    def handle(self, *args, **options):
+        purged = 0
+        for deletion in AccountDeletion.objects.filter(completed_at__isnull=True).order_by('requested_at'):
+            purge_account(deletion, batch_size=options['batch_size'])
+            purged += 1
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} account(s).'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from resumes.models import Resume
+from resumes.sections import RENDERER_VERSION
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored HTML of resumes rendered with an older renderer version'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rebuild every resume, not only stale ones')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        resumes = Resume.objects.order_by('pk')
+        if not options['all']:
+            resumes = resumes.exclude(render_version=RENDERER_VERSION)
+
+        batch = []
+        rebuilt = 0
+        for resume in resumes.iterator(chunk_size=batch_size):
+            resume.render_html()
+            batch.append(resume)
+            if len(batch) >= batch_size:
+                rebuilt += self._flush(batch)
+        rebuilt += self._flush(batch)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt HTML for {rebuilt} resume(s) (renderer version {RENDERER_VERSION}).'))
+
+    def _flush(self, batch):
+        count = len(batch)
+        if batch:
+            Resume.objects.bulk_update(batch, ['rendered_html', 'render_version'])
+            batch.clear()
+        return count
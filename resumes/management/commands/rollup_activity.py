@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from resumes.events import flush_events, get_activity_config
+from resumes.models import ActivityDailyRollup, ActivityEvent
+
+
+class Command(BaseCommand):
+    help = 'Compact activity events older than the retention period into daily aggregates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int,
+                            help='Keep raw events this many days (default: ACTIVITY_LOG RETENTION_DAYS)')
+
+    def handle(self, *args, **options):
+        flush_events()
+        retention_days = options['retention_days']
+        if retention_days is None:
+            retention_days = get_activity_config()['RETENTION_DAYS']
+        # Cut at midnight so every rolled-up day is complete
+        cutoff = timezone.localtime() - timedelta(days=retention_days)
+        cutoff = cutoff.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        old_events = ActivityEvent.objects.filter(created_at__lt=cutoff)
+        days = old_events.annotate(day=TruncDate('created_at')).values_list('day', flat=True).distinct().order_by('day')
+
+        rolled_up = 0
+        for day in list(days):
+            # One short transaction per day keeps SQLite's write lock brief
+            with transaction.atomic():
+                rolled_up += self._roll_up_day(old_events, day)
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {rolled_up} event(s) older than {cutoff:%Y-%m-%d}.'))
+
+    def _roll_up_day(self, old_events, day):
+        day_events = old_events.annotate(day=TruncDate('created_at')).filter(day=day)
+        totals = day_events.values('user_id', 'event_type').annotate(total=Count('id')).order_by()
+        count = 0
+        for row in totals:
+            updated = ActivityDailyRollup.objects.filter(
+                day=day, user_id=row['user_id'], event_type=row['event_type'],
+            ).update(count=F('count') + row['total'])
+            if not updated:
+                ActivityDailyRollup.objects.create(
+                    day=day, user_id=row['user_id'], event_type=row['event_type'], count=row['total'],
+                )
+            count += row['total']
+        ActivityEvent.objects.filter(pk__in=day_events.values('pk')).delete()
+        return count
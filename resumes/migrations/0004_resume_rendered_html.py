@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0003_resume_address_resume_certifications_resume_github_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='render_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='rendered_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0005_sharelink'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('event_type', models.CharField(choices=[('resume_created', 'Resume created'), ('resume_updated', 'Resume updated'), ('resume_deleted', 'Resume deleted'), ('pdf_downloaded', 'PDF downloaded'), ('password_changed', 'Password changed'), ('account_deleted', 'Account deleted')], max_length=32)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-day'], name='activity_rollup_user_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'user', 'event_type'), name='activity_rollup_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resume_id', models.BigIntegerField(blank=True, null=True)),
+                ('event_type', models.CharField(choices=[('resume_created', 'Resume created'), ('resume_updated', 'Resume updated'), ('resume_deleted', 'Resume deleted'), ('pdf_downloaded', 'PDF downloaded'), ('password_changed', 'Password changed'), ('account_deleted', 'Account deleted')], max_length=32)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at'], name='activity_user_created_idx'), models.Index(fields=['created_at'], name='activity_created_idx')],
+            },
+        ),
+    ]
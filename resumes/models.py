@@ -1,5 +1,8 @@
+from django.core import signing
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
+from .sections import RENDERER_VERSION, render_resume_html
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -37,6 +40,112 @@ class Resume(models.Model):
     references = models.TextField(blank=True, help_text="Professional references")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Pre-rendered body HTML, rebuilt on save and whenever RENDERER_VERSION changes
+    rendered_html = models.TextField(blank=True, editable=False)
+    render_version = models.PositiveSmallIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"{self.full_name} ({self.owner.username})"
+
+    @property
+    def html_is_stale(self):
+        return self.render_version != RENDERER_VERSION
+
+    def render_html(self):
+        self.rendered_html = render_resume_html(self)
+        self.render_version = RENDERER_VERSION
+
+    def save(self, *args, **kwargs):
+        self.render_html()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'rendered_html', 'render_version'}
+        super().save(*args, **kwargs)
+
+class ShareLink(models.Model):
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='share_links')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(blank=True, null=True)
+    revoked_at = models.DateTimeField(blank=True, null=True)
+
+    SIGNING_SALT = 'resumes.share'
+
+    def __str__(self):
+        return f"Share link for {self.resume.full_name}"
+
+    @property
+    def token(self):
+        return signing.dumps(self.pk, salt=self.SIGNING_SALT)
+
+    @classmethod
+    def pk_from_token(cls, token):
+        try:
+            return signing.loads(token, salt=cls.SIGNING_SALT)
+        except signing.BadSignature:
+            return None
+
+    @property
+    def is_active(self):
+        if self.revoked_at is not None:
+            return False
+        return self.expires_at is None or self.expires_at > timezone.now()
+
+class ActivityEvent(models.Model):
+    RESUME_CREATED = 'resume_created'
+    RESUME_UPDATED = 'resume_updated'
+    RESUME_DELETED = 'resume_deleted'
+    PDF_DOWNLOADED = 'pdf_downloaded'
+    PASSWORD_CHANGED = 'password_changed'
+    ACCOUNT_DELETED = 'account_deleted'
+    EVENT_TYPES = [
+        (RESUME_CREATED, 'Resume created'),
+        (RESUME_UPDATED, 'Resume updated'),
+        (RESUME_DELETED, 'Resume deleted'),
+        (PDF_DOWNLOADED, 'PDF downloaded'),
+        (PASSWORD_CHANGED, 'Password changed'),
+        (ACCOUNT_DELETED, 'Account deleted'),
+    ]
+
+    # No database constraints: the audit trail must outlive the user and
+    # resume rows it refers to, and deleting them must not touch this table.
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False,
+                             null=True, blank=True, related_name='+')
+    resume_id = models.BigIntegerField(null=True, blank=True)
+    event_type = models.CharField(max_length=32, choices=EVENT_TYPES)
+    metadata = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='activity_user_created_idx'),
+            models.Index(fields=['created_at'], name='activity_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_type_display()} at {self.created_at:%Y-%m-%d %H:%M}"
+
+class ActivityDailyRollup(models.Model):
+    day = models.DateField()
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False,
+                             null=True, blank=True, related_name='+')
+    event_type = models.CharField(max_length=32, choices=ActivityEvent.EVENT_TYPES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'user', 'event_type'], name='activity_rollup_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-day'], name='activity_rollup_user_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_type_display()} x{self.count} on {self.day}"
+
+class AccountDeletion(models.Model):
+    # The user row is removed last, after its resumes have been purged in batches
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    requested_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Deletion of user #{self.user_id}"
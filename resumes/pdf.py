@@ -0,0 +1,257 @@
+import hashlib
+import os
+import uuid
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from reportlab import rl_config
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import Flowable, PageBreak, Paragraph, SimpleDocTemplate, Spacer
+
+from .sections import iter_sections
+
+# Bump whenever the PDF layout changes; stored PDFs from older versions are
+# ignored and can be re-rendered in bulk with the prerender_pdfs command.
+PDF_TEMPLATE_VERSION = 3
+PDF_STORE_DIR = 'resume_pdfs'
+
+_DEFAULT_USE_A85 = rl_config.useA85
+
+_styles = None
+
+
+def get_pdf_styles():
+    global _styles
+    if _styles is None:
+        styles = getSampleStyleSheet()
+        _styles = {
+            'title': ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Title'],
+                fontSize=24,
+                spaceAfter=30,
+                alignment=1,  # Center alignment
+                textColor=colors.darkblue
+            ),
+            'heading': ParagraphStyle(
+                'CustomHeading',
+                parent=styles['Heading2'],
+                fontSize=14,
+                spaceAfter=12,
+                textColor=colors.darkblue,
+                fontName='Helvetica-Bold'
+            ),
+            'normal': ParagraphStyle(
+                'CustomNormal',
+                parent=styles['Normal'],
+                fontSize=11,
+                spaceAfter=6,
+                leading=14
+            ),
+        }
+    return _styles
+
+
+def resume_story(resume):
+    styles = get_pdf_styles()
+    story = []
+
+    # Header with name
+    story.append(Paragraph(escape(resume.full_name), styles['title']))
+    story.append(Spacer(1, 20))
+
+    for section, entries in iter_sections(resume):
+        # Paragraph parses its text as markup, so user text must be escaped
+        entries = [escape(entry) for entry in entries]
+        story.append(Paragraph(escape(section.title), styles['heading']))
+        if section.kind == 'list':
+            # Comma separated lists are laid out as a single paragraph
+            story.append(Paragraph(" • " + "\n • ".join(entries), styles['normal']))
+        else:
+            for entry in entries:
+                story.append(Paragraph((" • " if section.bullet else "") + entry, styles['normal']))
+        story.append(Spacer(1, 15))
+    return story
+
+
+def pdf_output_mode():
+    return 'compact' if getattr(settings, 'PDF_COMPACT_OUTPUT', True) else 'plain'
+
+
+def configure_reportlab():
+    """Apply PDF_COMPACT_OUTPUT to ReportLab's process-wide settings.
+
+    Called from AppConfig.ready() and again whenever the setting changes.
+    """
+    # ASCII85 only makes compressed streams ~25% larger
+    rl_config.useA85 = 0 if pdf_output_mode() == 'compact' else _DEFAULT_USE_A85
+
+
+def get_doc_options(title):
+    if pdf_output_mode() != 'compact':
+        return {}
+    # invariant drops the creation date and derives the document ID from the
+    # content, so identical resumes produce identical bytes
+    return {
+        'invariant': 1,
+        'pageCompression': 1,
+        'title': title,
+        'author': '',
+        'subject': '',
+        'creator': '',
+        'producer': '',
+        'keywords': '',
+    }
+
+
+def build_resume_pdf(resume):
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18,
+                            **get_doc_options(resume.full_name))
+    doc.build(resume_story(resume))
+    return buffer.getvalue()
+
+
+class _OutlineEntry(Flowable):
+    """Zero-size flowable that bookmarks the current page and adds it to the PDF outline."""
+
+    def __init__(self, key, title):
+        super().__init__()
+        self.key = key
+        self.title = title
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.canv.bookmarkPage(self.key)
+        self.canv.addOutlineEntry(self.title, self.key, level=0)
+
+
+class _FlowableStream(list):
+    """List that refills itself from an iterator of flowable batches.
+
+    BaseDocTemplate.build() only checks len(), reads and deletes [0] and
+    inserts split remainders at the front, so feeding it this way keeps one
+    resume's flowables (and database row) in memory instead of the whole
+    packet. CombinedPdfTests pins that behaviour.
+    """
+
+    def __init__(self, batches):
+        super().__init__()
+        self._batches = iter(batches)
+
+    def _fill(self):
+        while not list.__len__(self):
+            batch = next(self._batches, None)
+            if batch is None:
+                return
+            self.extend(batch)
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
+def _packet_batches(toc_entries, resumes, title):
+    styles = get_pdf_styles()
+    contents = [Paragraph(escape(title), styles['title'])]
+    for pk, full_name in toc_entries:
+        contents.append(Paragraph(f'<a href="#resume-{pk}" color="blue">{escape(full_name)}</a>', styles['normal']))
+    yield contents
+
+    for resume in resumes:
+        key = f'resume-{resume.pk}'
+        yield [PageBreak(), _OutlineEntry(key, resume.full_name)] + resume_story(resume)
+
+
+def build_combined_pdf(toc_entries, resumes, output, title='Resume Packet'):
+    """Lay out many resumes as one PDF in a single build.
+
+    toc_entries is an iterable of (pk, full_name) pairs for the contents page
+    and resumes an iterable of Resume objects in the same order; both may be
+    lazy. The contents page links to each resume and every resume gets an
+    outline (bookmark) entry, which avoids the second layout pass that a
+    page-numbered TableOfContents would need.
+
+    Only the flowables are streamed: ReportLab's canvas keeps every finished,
+    compressed page in memory until the document is saved, so memory still
+    grows with the page count (roughly 1 KiB per page for typical resumes).
+    """
+    doc = SimpleDocTemplate(output, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18,
+                            **get_doc_options(title))
+    doc.build(_FlowableStream(_packet_batches(toc_entries, resumes, title)))
+    return doc.page
+
+
+def pdf_etag(resume):
+    # Output is deterministic, so the resume version, template version and
+    # output mode identify the bytes; the ETag is known without reading or
+    # building the PDF
+    key = f'{resume.pk}:{resume.updated_at.isoformat()}:{PDF_TEMPLATE_VERSION}:{pdf_output_mode()}'
+    return '"%s"' % hashlib.sha256(key.encode()).hexdigest()
+
+
+def pdf_filename(resume):
+    return f'{resume.full_name.replace(" ", "_")}_resume.pdf'
+
+
+def stored_pdf_name(resume):
+    stamp = resume.updated_at.strftime('%Y%m%d%H%M%S%f')
+    return f'{PDF_STORE_DIR}/{resume.pk}/{stamp}-v{PDF_TEMPLATE_VERSION}-{pdf_output_mode()}.pdf'
+
+
+def get_stored_pdf(resume):
+    try:
+        with default_storage.open(stored_pdf_name(resume), 'rb') as stored:
+            return stored.read()
+    except FileNotFoundError:
+        # Not rendered yet, or pruned by a store_pdf() for newer content
+        return None
+
+
+def store_pdf(resume, data):
+    name = stored_pdf_name(resume)
+    directory = f'{PDF_STORE_DIR}/{resume.pk}'
+    if default_storage.exists(directory):
+        # Only the render for the current content and template is kept;
+        # other writers' temporary files are left alone
+        for old_name in default_storage.listdir(directory)[1]:
+            if f'{directory}/{old_name}' != name and not old_name.startswith('.tmp-'):
+                default_storage.delete(f'{directory}/{old_name}')
+    try:
+        default_storage.path(name)
+    except NotImplementedError:
+        # Remote storages have no rename; the name is derived from the content
+        # and template version, so an existing file already holds these bytes
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(data))
+        return
+    # Write aside and rename over the old file, so concurrent readers see
+    # either the old or the new PDF but never a missing one
+    tmp_name = default_storage.save(f'{directory}/.tmp-{uuid.uuid4().hex}.pdf', ContentFile(data))
+    os.replace(default_storage.path(tmp_name), default_storage.path(name))
+
+
+def delete_stored_pdfs(resume_pk):
+    directory = f'{PDF_STORE_DIR}/{resume_pk}'
+    if default_storage.exists(directory):
+        for name in default_storage.listdir(directory)[1]:
+            default_storage.delete(f'{directory}/{name}')
+
+
+def get_or_build_pdf(resume):
+    data = get_stored_pdf(resume)
+    if data is None:
+        data = build_resume_pdf(resume)
+        store_pdf(resume, data)
+    return data
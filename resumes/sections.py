@@ -0,0 +1,65 @@
+from collections import namedtuple
+
+from django.template.loader import render_to_string
+
+# Bump whenever the section definitions or the body template change so that
+# stored HTML is rebuilt (see the rebuild_resume_html management command).
+RENDERER_VERSION = 1
+
+# kind:
+#   'labelled' - one "Label: value" entry per non-empty field
+#   'text'     - the whole field as a single block of text
+#   'lines'    - one entry per non-empty line
+#   'list'     - entries separated by commas or newlines
+# bullet marks sections whose entries are shown as a bulleted list.
+Section = namedtuple('Section', ['key', 'title', 'kind', 'fields', 'bullet'])
+
+SECTIONS = [
+    Section('contact', 'Contact Information', 'labelled',
+            (('Email', 'email'), ('Phone', 'phone'), ('Address', 'address')), False),
+    Section('online', 'Online Presence', 'labelled',
+            (('LinkedIn', 'linkedin'), ('GitHub', 'github'), ('Portfolio', 'portfolio')), False),
+    Section('summary', 'Professional Summary', 'text', ('summary',), False),
+    Section('skills', 'Skills', 'list', ('skills',), True),
+    Section('languages', 'Languages', 'lines', ('languages',), True),
+    Section('experience', 'Work Experience', 'lines', ('experience',), False),
+    Section('education', 'Education', 'lines', ('education',), False),
+    Section('certifications', 'Certifications', 'lines', ('certifications',), True),
+    Section('projects', 'Projects & Achievements', 'lines', ('projects',), False),
+    Section('interests', 'Interests & Hobbies', 'text', ('interests',), False),
+    Section('references', 'Professional References', 'lines', ('references',), False),
+]
+
+SECTIONS_BY_KEY = {section.key: section for section in SECTIONS}
+
+
+def section_entries(resume, section):
+    if section.kind == 'labelled':
+        return [f"{label}: {getattr(resume, field)}"
+                for label, field in section.fields if getattr(resume, field)]
+
+    value = getattr(resume, section.fields[0])
+    if not value:
+        return []
+    if section.kind == 'text':
+        return [value]
+    if section.kind == 'list':
+        value = value.replace('\n', ',')
+        separator = ','
+    else:
+        separator = '\n'
+    return [entry.strip() for entry in value.split(separator) if entry.strip()]
+
+
+def iter_sections(resume):
+    """Yield (section, entries) for every section that has content."""
+    for section in SECTIONS:
+        entries = section_entries(resume, section)
+        if entries:
+            yield section, entries
+
+
+def render_resume_html(resume):
+    return render_to_string('resumes/resume_body.html', {
+        'sections': list(iter_sections(resume)),
+    })
@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.core.signals import request_finished, setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .events import event_buffer
+from .models import Resume, UserProfile
+from .pdf import configure_reportlab, delete_stored_pdfs
+
+
+@receiver(post_save, sender=User)
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    # Every new account gets its profile row in the same transaction as the user
+    if created and not raw:
+        UserProfile.objects.create(user=instance)
+
+
+@receiver(post_delete, sender=Resume)
+def delete_resume_pdfs(sender, instance, **kwargs):
+    delete_stored_pdfs(instance.pk)
+
+
+@receiver(request_finished)
+def flush_activity_events(sender, **kwargs):
+    # Writes buffered events once the oldest has waited FLUSH_INTERVAL seconds
+    event_buffer.flush_if_due()
+
+
+@receiver(setting_changed)
+def reconfigure_reportlab(sender, setting, **kwargs):
+    if setting == 'PDF_COMPACT_OUTPUT':
+        configure_reportlab()
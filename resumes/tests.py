@@ -1,3 +1,758 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.hashers import ScryptPasswordHasher, make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.utils.html import escape as html_escape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+from .events import event_buffer, flush_events, record_event
+from .accounts import start_background_purge
+from .hashers import TunedScryptPasswordHasher
+from .models import AccountDeletion, ActivityDailyRollup, ActivityEvent, Resume, ShareLink, UserProfile
+from .pdf import (
+    PDF_TEMPLATE_VERSION, _FlowableStream, build_combined_pdf, build_resume_pdf, get_or_build_pdf,
+    get_stored_pdf, pdf_etag, store_pdf, stored_pdf_name,
+)
+from .sections import RENDERER_VERSION, SECTIONS
+from .throttling import get_throttle_stats, pdf_build_slot, reset_throttle_stats, take_token
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+def make_resume(owner, **fields):
+    values = {
+        'full_name': 'Jane Doe',
+        'email': 'jane@example.com',
+        'summary': 'Backend developer.',
+        'skills': 'Python, Django',
+        'experience': 'Acme | Developer | 2020-2024\n- Built things',
+    }
+    values.update(fields)
+    return Resume.objects.create(owner=owner, **values)
+
+
+def freeze_throttle_clock(test, now=6000.0):
+    # Rate limit windows are fixed; a test must not straddle a window boundary
+    patcher = mock.patch('resumes.throttling.time')
+    clock = patcher.start()
+    test.addCleanup(patcher.stop)
+    clock.time.return_value = now
+    return clock
+
+
+class SignupAndHashingTests(TestCase):
+    password = 'Secret!pass1'
+
+    def signup(self):
+        return self.client.post('/signup/', {
+            'username': 'jane',
+            'email': 'jane@gmail.com',
+            'first_name': 'Jane',
+            'last_name': 'Doe',
+            'password1': self.password,
+            'password2': self.password,
+        })
+
+    def login(self, username='jane'):
+        return self.client.post('/login/', {'username': username, 'password': self.password})
+
+    def test_signup_hashes_once_and_logs_in(self):
+        encode, verify = TunedScryptPasswordHasher.encode, TunedScryptPasswordHasher.verify
+        with mock.patch.object(TunedScryptPasswordHasher, 'encode', autospec=True, side_effect=encode) as encoded, \
+                mock.patch.object(TunedScryptPasswordHasher, 'verify', autospec=True, side_effect=verify) as verified:
+            response = self.signup()
+        self.assertRedirects(response, '/', fetch_redirect_response=False)
+        self.assertEqual(encoded.call_count, 1)
+        self.assertEqual(verified.call_count, 0)
+        user = User.objects.get(username='jane')
+        self.assertEqual(int(self.client.session['_auth_user_id']), user.pk)
+        self.assertTrue(user.password.startswith('scrypt$'))
+
+    def test_signal_creates_exactly_one_profile(self):
+        self.signup()
+        user = User.objects.get(username='jane')
+        self.assertEqual(UserProfile.objects.filter(user=user).count(), 1)
+        User.objects.create_user('other', password=self.password)
+        self.assertEqual(UserProfile.objects.filter(user__username='other').count(), 1)
+
+    def test_profile_is_created_for_older_accounts(self):
+        user = User.objects.create_user('jane', password=self.password)
+        UserProfile.objects.filter(user=user).delete()
+        self.client.force_login(user)
+        self.assertEqual(self.client.get('/profile/').status_code, 200)
+        self.assertEqual(UserProfile.objects.filter(user=user).count(), 1)
+
+    def test_login_upgrades_pbkdf2_hash(self):
+        user = User.objects.create_user('jane')
+        User.objects.filter(pk=user.pk).update(password=make_password(self.password, hasher='pbkdf2_sha256'))
+        self.assertEqual(self.login().status_code, 302)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$'))
+
+    def test_login_upgrades_scrypt_hash_with_other_parameters(self):
+        weak = ScryptPasswordHasher()
+        weak.work_factor = 2 ** 12
+        user = User.objects.create_user('jane')
+        old_hash = make_password(self.password, hasher=weak)
+        User.objects.filter(pk=user.pk).update(password=old_hash)
+        self.assertEqual(self.login().status_code, 302)
+        user.refresh_from_db()
+        self.assertNotEqual(user.password, old_hash)
+        self.assertEqual(TunedScryptPasswordHasher().decode(user.password)['work_factor'], settings.PASSWORD_SCRYPT['WORK_FACTOR'])
+
+
+FULL_RESUME = {
+    'phone': '555-0100',
+    'address': '1 Main St',
+    'linkedin': 'https://linkedin.com/in/jane',
+    'github': 'https://github.com/jane',
+    'portfolio': 'https://jane.example.com',
+    'languages': 'English: Native',
+    'education': 'BSc | State University',
+    'certifications': 'AWS Certified',
+    'projects': 'Resume Builder',
+    'interests': 'Photography',
+    'references': 'Available on request',
+}
+
+
+class ResumeHtmlTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('jane', password='Secret!pass1')
+        self.client.force_login(self.user)
+
+    def make_stale(self, resume, html='old'):
+        Resume.objects.filter(pk=resume.pk).update(rendered_html=html, render_version=RENDERER_VERSION - 1)
+
+    def test_save_renders_html(self):
+        resume = make_resume(self.user)
+        resume.refresh_from_db()
+        self.assertEqual(resume.render_version, RENDERER_VERSION)
+        self.assertIn('Professional Summary', resume.rendered_html)
+        self.assertIn('Backend developer.', resume.rendered_html)
+
+    def test_detail_shows_every_section_escaped(self):
+        resume = make_resume(self.user, summary='<script>alert(1)</script>', **FULL_RESUME)
+        response = self.client.get(f'/resumes/{resume.pk}/')
+        for section in SECTIONS:
+            self.assertContains(response, f'<h5>{html_escape(section.title)}</h5>', count=1)
+        self.assertNotContains(response, '<script>alert(1)</script>')
+        self.assertContains(response, '&lt;script&gt;alert(1)&lt;/script&gt;')
+
+    def test_detail_rerenders_stale_html_without_touching_updated_at(self):
+        resume = make_resume(self.user)
+        self.make_stale(resume)
+        response = self.client.get(f'/resumes/{resume.pk}/')
+        self.assertContains(response, 'Backend developer.')
+        stored = Resume.objects.get(pk=resume.pk)
+        self.assertEqual(stored.render_version, RENDERER_VERSION)
+        self.assertEqual(stored.updated_at, resume.updated_at)
+
+    def test_rebuild_command(self):
+        stale = [make_resume(self.user, full_name=f'Jane {i}') for i in range(2)]
+        current = make_resume(self.user)
+        for resume in stale:
+            self.make_stale(resume)
+        Resume.objects.filter(pk=current.pk).update(rendered_html='current')
+
+        out = StringIO()
+        call_command('rebuild_resume_html', batch_size=1, stdout=out)
+        self.assertIn('Rebuilt HTML for 2 resume(s)', out.getvalue())
+        self.assertFalse(Resume.objects.filter(render_version=RENDERER_VERSION - 1).exists())
+        self.assertEqual(Resume.objects.get(pk=current.pk).rendered_html, 'current')
+
+        call_command('rebuild_resume_html', all=True, stdout=out)
+        self.assertIn('Rebuilt HTML for 3 resume(s)', out.getvalue())
+        self.assertIn('Backend developer.', Resume.objects.get(pk=current.pk).rendered_html)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('jane', password='Secret!pass1')
+        self.resume = make_resume(self.user)
+        make_resume(self.user, full_name='Jane Second')
+        self.client.force_login(self.user)
+
+    def test_single_resume_exports(self):
+        for fmt, content_type in (('txt', 'text/plain'), ('md', 'text/markdown'), ('json', 'application/json')):
+            response = self.client.get(f'/resumes/{self.resume.pk}/export/{fmt}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response['Content-Type'].startswith(content_type))
+            body = b''.join(response.streaming_content).decode()
+            self.assertIn('Jane Doe', body)
+            if fmt == 'json':
+                self.assertEqual(json.loads(body)['basics']['name'], 'Jane Doe')
+
+    def test_bulk_exports(self):
+        for fmt in ('txt', 'md', 'json'):
+            response = self.client.get(f'/resumes/export/{fmt}/')
+            self.assertEqual(response.status_code, 200)
+            body = b''.join(response.streaming_content).decode()
+            self.assertIn('Jane Doe', body)
+            self.assertIn('Jane Second', body)
+        response = self.client.get('/resumes/export/json/')
+        self.assertEqual(len(json.loads(b''.join(response.streaming_content))), 2)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get('/resumes/export/xml/').status_code, 404)
+        self.assertEqual(self.client.get(f'/resumes/{self.resume.pk}/export/xml/').status_code, 404)
+
+    def test_other_users_resume_is_not_exported(self):
+        other = User.objects.create_user('other', password='Secret!pass1')
+        resume = make_resume(other)
+        self.assertEqual(self.client.get(f'/resumes/{resume.pk}/export/txt/').status_code, 404)
+
+
+class PdfOutputTests(TestCase):
+    # A one-page sample resume came out at ~1.7 KB with compact output enabled
+    SAMPLE_PDF_BUDGET = 4 * 1024
+
+    def setUp(self):
+        self.user = User.objects.create_user('jane', password='Secret!pass1')
+        self.resume = make_resume(self.user)
+
+    def test_renders_are_byte_identical(self):
+        first = build_resume_pdf(self.resume)
+        with mock.patch('time.time', return_value=time.time() + 3600):
+            second = build_resume_pdf(Resume.objects.get(pk=self.resume.pk))
+        self.assertEqual(first, second)
+
+    def test_sample_resume_fits_byte_budget(self):
+        pdf = build_resume_pdf(self.resume)
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertLess(len(pdf), self.SAMPLE_PDF_BUDGET)
+
+    def test_output_mode_is_part_of_the_etag_and_stored_name(self):
+        name, etag = stored_pdf_name(self.resume), pdf_etag(self.resume)
+        with override_settings(PDF_COMPACT_OUTPUT=False):
+            self.assertNotEqual(stored_pdf_name(self.resume), name)
+            self.assertNotEqual(pdf_etag(self.resume), etag)
+
+    def test_turning_compact_output_off_restores_ascii85(self):
+        self.assertNotIn(b'ASCII85Decode', build_resume_pdf(self.resume))
+        with override_settings(PDF_COMPACT_OUTPUT=False):
+            self.assertIn(b'ASCII85Decode', build_resume_pdf(self.resume))
+        self.assertNotIn(b'ASCII85Decode', build_resume_pdf(self.resume))
+
+    def test_pdf_has_no_producer_metadata(self):
+        pdf = build_resume_pdf(self.resume)
+        self.assertIn(b'/Producer ()', pdf)
+        # invariant output pins the dates instead of using the build time
+        self.assertIn(b"/CreationDate (D:20000101000000+00'00')", pdf)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PdfStoreTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('jane', password='Secret!pass1')
+        self.resume = make_resume(self.user)
+
+    def stored_files(self):
+        return sorted(default_storage.listdir(f'resume_pdfs/{self.resume.pk}')[1])
+
+    def test_missing_file_is_a_cache_miss(self):
+        self.assertIsNone(get_stored_pdf(self.resume))
+        with mock.patch.object(default_storage, 'exists', return_value=True):
+            self.assertIsNone(get_stored_pdf(self.resume))
+
+    def test_store_replaces_the_file_without_removing_it_first(self):
+        store_pdf(self.resume, b'%PDF-old')
+        with mock.patch.object(default_storage, 'delete', side_effect=AssertionError('deleted')):
+            store_pdf(self.resume, b'%PDF-new')
+        self.assertEqual(get_stored_pdf(self.resume), b'%PDF-new')
+        self.assertEqual(self.stored_files(), [stored_pdf_name(self.resume).rsplit('/', 1)[1]])
+
+    def test_store_prunes_renders_of_older_content(self):
+        store_pdf(self.resume, b'%PDF-old')
+        old_name = stored_pdf_name(self.resume)
+        self.resume.summary = 'Changed.'
+        self.resume.save()
+        store_pdf(self.resume, b'%PDF-new')
+        self.assertFalse(default_storage.exists(old_name))
+        self.assertEqual(len(self.stored_files()), 1)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ActivityLogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('jane', password='Secret!pass1')
+
+    def tearDown(self):
+        flush_events()
+
+    @override_settings(ACTIVITY_LOG={'BATCH_SIZE': 3, 'FLUSH_INTERVAL': 3600})
+    def test_events_are_written_in_batches(self):
+        record_event(ActivityEvent.PASSWORD_CHANGED, user=self.user)
+        record_event(ActivityEvent.PASSWORD_CHANGED, user=self.user)
+        self.assertEqual(ActivityEvent.objects.count(), 0)
+        self.assertEqual(len(event_buffer), 2)
+        record_event(ActivityEvent.PASSWORD_CHANGED, user=self.user)
+        self.assertEqual(ActivityEvent.objects.count(), 3)
+        self.assertEqual(len(event_buffer), 0)
+
+    @override_settings(ACTIVITY_LOG={'BATCH_SIZE': 100, 'FLUSH_INTERVAL': 3600})
+    def test_flush_events_writes_pending_events(self):
+        record_event(ActivityEvent.PASSWORD_CHANGED, user=self.user)
+        self.assertEqual(flush_events(), 1)
+        self.assertEqual(ActivityEvent.objects.filter(user=self.user).count(), 1)
+
+    @override_settings(ACTIVITY_LOG={'BATCH_SIZE': 100, 'FLUSH_INTERVAL': 0})
+    def test_events_older_than_interval_are_flushed(self):
+        record_event(ActivityEvent.PASSWORD_CHANGED, user=self.user)
+        self.assertEqual(ActivityEvent.objects.count(), 1)
+
+    @override_settings(ACTIVITY_LOG={'BATCH_SIZE': 100, 'FLUSH_INTERVAL': 3600})
+    def test_views_record_events(self):
+        self.client.force_login(self.user)
+        self.client.post('/resumes/create/', {'full_name': 'Jane Doe', 'email': 'jane@example.com'})
+        resume = Resume.objects.get()
+        self.client.get(f'/resumes/{resume.pk}/pdf/')
+        self.client.post(f'/resumes/{resume.pk}/delete/')
+        self.assertEqual(ActivityEvent.objects.count(), 0)
+        flush_events()
+        self.assertEqual(
+            list(ActivityEvent.objects.order_by('pk').values_list('event_type', 'resume_id')),
+            [
+                (ActivityEvent.RESUME_CREATED, resume.pk),
+                (ActivityEvent.PDF_DOWNLOADED, resume.pk),
+                (ActivityEvent.RESUME_DELETED, resume.pk),
+            ],
+        )
+        self.assertContains(self.client.get('/profile/'), 'PDF downloaded')
+
+    def _old_event(self, event_type, days_ago):
+        return ActivityEvent.objects.create(
+            user=self.user, event_type=event_type,
+            created_at=timezone.now() - timedelta(days=days_ago),
+        )
+
+    def test_rollup_compacts_old_events(self):
+        for _ in range(3):
+            self._old_event(ActivityEvent.PDF_DOWNLOADED, 100)
+        self._old_event(ActivityEvent.RESUME_CREATED, 100)
+        recent = self._old_event(ActivityEvent.PDF_DOWNLOADED, 1)
+
+        call_command('rollup_activity', retention_days=90, stdout=StringIO())
+
+        self.assertEqual(list(ActivityEvent.objects.values_list('pk', flat=True)), [recent.pk])
+        self.assertEqual(
+            dict(ActivityDailyRollup.objects.values_list('event_type', 'count')),
+            {ActivityEvent.PDF_DOWNLOADED: 3, ActivityEvent.RESUME_CREATED: 1},
+        )
+
+        # A late event for an already rolled-up day is added to the existing row
+        self._old_event(ActivityEvent.PDF_DOWNLOADED, 100)
+        call_command('rollup_activity', retention_days=90, stdout=StringIO())
+        self.assertEqual(ActivityDailyRollup.objects.get(event_type=ActivityEvent.PDF_DOWNLOADED).count, 4)
+
+    def test_rollup_with_zero_retention(self):
+        self._old_event(ActivityEvent.PDF_DOWNLOADED, 1)
+        call_command('rollup_activity', retention_days=0, stdout=StringIO())
+        self.assertEqual(ActivityEvent.objects.count(), 0)
+        self.assertEqual(ActivityDailyRollup.objects.get().count, 1)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PDF_THROTTLE={'RATE': 2, 'PERIOD': 60, 'MAX_CONCURRENT': 1})
+class PdfThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_throttle_stats()
+        self.clock = freeze_throttle_clock(self)
+        self.user = User.objects.create_user('jane', password='Secret!pass1')
+        self.resume = make_resume(self.user)
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        flush_events()
+
+    def pdf_url(self, resume=None):
+        return f'/resumes/{(resume or self.resume).pk}/pdf/'
+
+    def test_requests_over_the_rate_get_429(self):
+        self.assertEqual(self.client.get(self.pdf_url()).status_code, 200)
+        self.assertEqual(self.client.get(self.pdf_url()).status_code, 200)
+        response = self.client.get(self.pdf_url())
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(get_throttle_stats()['throttled'], 1)
+
+    def test_limit_is_per_user(self):
+        for _ in range(3):
+            self.client.get(self.pdf_url())
+        other = User.objects.create_user('other', password='Secret!pass1')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(self.pdf_url(make_resume(other))).status_code, 200)
+
+    def test_revalidation_does_not_use_tokens(self):
+        etag = self.client.get(self.pdf_url())['ETag']
+        for _ in range(5):
+            self.assertEqual(self.client.get(self.pdf_url(), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(self.pdf_url()).status_code, 200)
+
+    def test_cold_build_gets_503_when_slots_are_busy(self):
+        with pdf_build_slot():
+            response = self.client.get(self.pdf_url())
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(get_throttle_stats()['rejected_busy'], 1)
+        self.assertEqual(self.client.get(self.pdf_url()).status_code, 200)
+
+    def test_stored_pdf_is_served_while_slots_are_busy(self):
+        self.client.get(self.pdf_url())
+        with pdf_build_slot():
+            self.assertEqual(self.client.get(self.pdf_url()).status_code, 200)
+
+    def test_window_boundary_allows_up_to_twice_the_rate(self):
+        self.clock.time.return_value = 6059.0
+        self.assertEqual([take_token('edge'), take_token('edge')], [0, 0])
+        self.assertEqual(take_token('edge'), 1)
+        self.clock.time.return_value = 6060.0
+        self.assertEqual([take_token('edge'), take_token('edge')], [0, 0])
+        self.assertGreater(take_token('edge'), 0)
+
+    def test_stats_are_kept_in_the_shared_cache(self):
+        # Counts from other workers are already in the cache
+        cache.set('pdf-throttle:stats:allowed', 5, None)
+        self.client.get(self.pdf_url())
+        stats = get_throttle_stats()
+        self.assertEqual(stats['allowed'], 6)
+        self.assertEqual(stats['in_flight'], 0)
+        reset_throttle_stats()
+        self.assertEqual(get_throttle_stats()['allowed'], 0)
+
+    def test_concurrent_takes_are_counted_atomically(self):
+        results = []
+        barrier = threading.Barrier(20)
+
+        def take():
+            barrier.wait()
+            results.append(take_token('race'))
+
+        threads = [threading.Thread(target=take) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(0), 2)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, SHARE_CACHE_MAX_AGE=300)
+class ShareLinkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        freeze_throttle_clock(self)
+        self.user = User.objects.create_user('jane', password='Secret!pass1')
+        self.resume = make_resume(self.user)
+        self.link = ShareLink.objects.create(resume=self.resume)
+
+    def tearDown(self):
+        flush_events()
+
+    def test_owner_creates_and_revokes_links(self):
+        self.client.force_login(self.user)
+        self.client.post(f'/resumes/{self.resume.pk}/share/', {'expires_in': '7'})
+        link = ShareLink.objects.latest('pk')
+        self.assertIsNotNone(link.expires_at)
+        self.assertContains(self.client.get(f'/resumes/{self.resume.pk}/'), link.token)
+
+        self.client.post(f'/resumes/{self.resume.pk}/share/{link.pk}/revoke/')
+        link.refresh_from_db()
+        self.assertIsNotNone(link.revoked_at)
+
+    def test_public_page_is_cacheable(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/share/{self.link.token}/')
+        self.assertContains(response, 'Jane Doe')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=300')
+        self.assertNotIn('Vary', response)
+        self.assertNotIn('Set-Cookie', response)
+
+    def test_conditional_requests_get_304(self):
+        for url in (f'/share/{self.link.token}/', f'/share/{self.link.token}/pdf/'):
+            etag = self.client.get(url)['ETag']
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_when_resume_is_updated(self):
+        url = f'/share/{self.link.token}/'
+        etag = self.client.get(url)['ETag']
+        self.resume.summary = 'Changed.'
+        self.resume.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_forged_token_is_rejected(self):
+        self.assertEqual(self.client.get(f'/share/{self.link.token}x/').status_code, 404)
+
+    def test_revoked_link_is_rejected(self):
+        self.link.revoked_at = timezone.now()
+        self.link.save()
+        self.assertEqual(self.client.get(f'/share/{self.link.token}/').status_code, 404)
+        self.assertEqual(self.client.get(f'/share/{self.link.token}/pdf/').status_code, 404)
+
+    def test_expired_link_is_rejected(self):
+        self.link.expires_at = timezone.now() - timedelta(seconds=1)
+        self.link.save()
+        self.assertEqual(self.client.get(f'/share/{self.link.token}/').status_code, 404)
+
+    def test_max_age_is_capped_by_expiry(self):
+        self.link.expires_at = timezone.now() + timedelta(seconds=60)
+        self.link.save()
+        max_age = int(self.client.get(f'/share/{self.link.token}/')['Cache-Control'].split('=')[1])
+        self.assertLessEqual(max_age, 60)
+
+    @override_settings(PDF_THROTTLE={'RATE': 1, 'PERIOD': 60, 'MAX_CONCURRENT': 1})
+    def test_public_pdf_is_throttled_per_link(self):
+        url = f'/share/{self.link.token}/pdf/'
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.1').status_code, 200)
+        # Another client behind the same CDN edge, or a different one, shares the link's allowance
+        response = self.client.get(url, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 429)
+        self.assertNotIn('public', response.get('Cache-Control', ''))
+        other = ShareLink.objects.create(resume=self.resume)
+        self.assertEqual(self.client.get(f'/share/{other.token}/pdf/', REMOTE_ADDR='10.0.0.1').status_code, 200)
+
+    @override_settings(PDF_THROTTLE={
+        'RATE': 1, 'PERIOD': 60, 'MAX_CONCURRENT': 1,
+        'SHARE_KEY': 'link+client', 'CLIENT_IP_HEADER': 'HTTP_X_FORWARDED_FOR', 'TRUSTED_PROXIES': 2,
+    })
+    def test_public_pdf_can_be_throttled_per_forwarded_client(self):
+        url = f'/share/{self.link.token}/pdf/'
+
+        def get(forwarded_for):
+            return self.client.get(url, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=forwarded_for).status_code
+
+        self.assertEqual(get('203.0.113.7, 198.51.100.1'), 200)
+        # A spoofed leftmost entry does not buy a new allowance
+        self.assertEqual(get('192.0.2.99, 203.0.113.7, 198.51.100.2'), 429)
+        self.assertEqual(get('203.0.113.8, 198.51.100.1'), 200)
+
+    @override_settings(PDF_THROTTLE={'SHARE_KEY': 'ip'})
+    def test_unknown_share_key_mode_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.client.get(f'/share/{self.link.token}/pdf/')
+
+    @override_settings(PDF_THROTTLE={'RATE': 10, 'PERIOD': 60, 'MAX_CONCURRENT': 1})
+    def test_public_cold_build_respects_concurrency_cap(self):
+        with pdf_build_slot():
+            response = self.client.get(f'/share/{self.link.token}/pdf/')
+        self.assertEqual(response.status_code, 503)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, ACCOUNT_PURGE_IN_BACKGROUND=False, ACCOUNT_PURGE_BATCH_SIZE=3)
+class AccountDeletionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('jane', password='Secret!pass1')
+        self.resumes = [make_resume(self.user, full_name=f'Jane {i}') for i in range(7)]
+        self.link = ShareLink.objects.create(resume=self.resumes[0])
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        flush_events()
+
+    def delete_account(self):
+        return self.client.post('/profile/delete-account/', {'confirmation': 'DELETE'})
+
+    def test_request_only_deactivates(self):
+        self.assertRedirects(self.delete_account(), '/', fetch_redirect_response=False)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(Resume.objects.filter(owner=self.user).count(), 7)
+        self.assertTrue(AccountDeletion.objects.filter(user=self.user, completed_at__isnull=True).exists())
+        # The session is gone
+        self.assertEqual(self.client.get('/resumes/').status_code, 302)
+
+    def test_share_links_stop_working_immediately(self):
+        self.delete_account()
+        self.assertEqual(self.client.get(f'/share/{self.link.token}/').status_code, 404)
+        self.assertEqual(self.client.get(f'/share/{self.link.token}/pdf/').status_code, 404)
+        self.link.refresh_from_db()
+        self.assertIsNotNone(self.link.revoked_at)
+
+    def test_share_links_of_inactive_owner_are_rejected(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get(f'/share/{self.link.token}/').status_code, 404)
+
+    def test_purge_removes_rows_and_files(self):
+        profile = UserProfile.objects.get(user=self.user)
+        profile.profile_picture.save('jane.png', ContentFile(b'png'), save=True)
+        picture = profile.profile_picture.name
+        get_or_build_pdf(self.resumes[0])
+        pdf_name = stored_pdf_name(self.resumes[0])
+
+        self.delete_account()
+        call_command('purge_deleted_accounts', stdout=StringIO())
+
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Resume.objects.filter(owner_id=self.user.pk).exists())
+        self.assertFalse(ShareLink.objects.exists())
+        self.assertFalse(UserProfile.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(default_storage.exists(picture))
+        self.assertFalse(default_storage.exists(pdf_name))
+        self.assertIsNotNone(AccountDeletion.objects.get(user_id=self.user.pk).completed_at)
+
+    def test_purge_leaves_other_accounts_alone(self):
+        other = User.objects.create_user('other', password='Secret!pass1')
+        make_resume(other)
+        self.delete_account()
+        call_command('purge_deleted_accounts', stdout=StringIO())
+        self.assertEqual(Resume.objects.filter(owner=other).count(), 1)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, ACCOUNT_PURGE_BATCH_SIZE=2)
+class BackgroundPurgeTests(TransactionTestCase):
+    def test_background_thread_purges_account(self):
+        user = User.objects.create_user('jane', password='Secret!pass1')
+        for i in range(5):
+            make_resume(user, full_name=f'Jane {i}')
+        deletion = AccountDeletion.objects.create(user=user)
+        start_background_purge(deletion.pk).join(timeout=30)
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        self.assertFalse(Resume.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class CombinedPdfTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'Secret!pass1')
+
+    def test_markup_in_user_text_is_escaped(self):
+        resume = make_resume(
+            self.user, full_name='<b>Jane', summary='<font size=abc>big</font> & <b>bold',
+            skills='C<sub>, <i>Go', references='a < b',
+        )
+        self.assertTrue(build_resume_pdf(resume).startswith(b'%PDF'))
+
+    def test_flowable_stream_is_consumed_lazily_by_build(self):
+        # Pins the parts of BaseDocTemplate.build() that _FlowableStream relies on
+        style = getSampleStyleSheet()['Normal']
+        pulled = []
+        drawn = []
+
+        class Marker(Paragraph):
+            def draw(self):
+                drawn.append(self.batch)
+                super().draw()
+
+        def batches():
+            for index in range(5):
+                pulled.append((index, len(drawn)))
+                marker = Marker(f'Batch {index}', style)
+                marker.batch = index
+                # Long enough to split across pages, exercising the insert-at-front path
+                yield [marker, Paragraph('word ' * 2000, style)]
+
+        stream = _FlowableStream(batches())
+        doc = SimpleDocTemplate(tempfile.TemporaryFile())
+        doc.build(stream)
+
+        self.assertEqual(drawn, [0, 1, 2, 3, 4])
+        # Each batch is only pulled once the previous one has been drawn
+        self.assertEqual(pulled, [(index, index) for index in range(5)])
+        self.assertEqual(len(stream), 0)
+        self.assertGreater(doc.page, 5)
+
+    def test_combined_pdf_has_a_page_per_resume(self):
+        resumes = [make_resume(self.user, full_name=f'Jane {i}') for i in range(4)]
+        with tempfile.TemporaryFile() as output:
+            pages = build_combined_pdf(((r.pk, r.full_name) for r in resumes), iter(resumes), output)
+        self.assertEqual(pages, 5)
+
+    def test_admin_action_builds_one_packet(self):
+        resumes = [make_resume(self.user, full_name=f'Jane <{i}>') for i in range(3)]
+        self.client.force_login(self.user)
+        response = self.client.post('/admin/resumes/resume/', {
+            'action': 'download_combined_pdf',
+            '_selected_action': [resume.pk for resume in resumes],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PrerenderPdfsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('jane', password='Secret!pass1')
+        self.other = User.objects.create_user('other', password='Secret!pass1')
+        self.resumes = [make_resume(self.user, full_name=f'Jane {i}') for i in range(4)]
+        self.resumes.append(make_resume(self.other))
+        self.checkpoint = Path(tempfile.mkdtemp()) / 'checkpoint'
+
+    def prerender(self, **options):
+        out, err = StringIO(), StringIO()
+        call_command('prerender_pdfs', workers=1, chunk_size=2, checkpoint=str(self.checkpoint),
+                     stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_renders_and_then_skips_everything(self):
+        out, _ = self.prerender()
+        self.assertIn('Rendered 5 PDF(s), skipped 0', out)
+        for resume in self.resumes:
+            self.assertTrue(default_storage.exists(stored_pdf_name(resume)))
+        self.assertFalse(self.checkpoint.exists())
+        out, _ = self.prerender()
+        self.assertIn('Rendered 0 PDF(s), skipped 5', out)
+
+    def test_owner_filter(self):
+        out, _ = self.prerender(owner='other')
+        self.assertIn('Rendered 1 PDF(s)', out)
+        self.assertFalse(default_storage.exists(stored_pdf_name(self.resumes[0])))
+
+    def test_failures_are_reported_and_the_run_continues(self):
+        broken_pk = self.resumes[1].pk
+
+        def build(resume):
+            if resume.pk == broken_pk:
+                raise ValueError('bad markup')
+            return build_resume_pdf(resume)
+
+        with mock.patch('resumes.management.commands._prerender_worker.build_resume_pdf', build):
+            out, err = self.prerender()
+        self.assertIn('Rendered 4 PDF(s), skipped 0 up to date, failed 1', out)
+        self.assertIn(f'Resume #{broken_pk} failed: ValueError: bad markup', err)
+
+    def test_resumes_from_checkpoint(self):
+        self.checkpoint.write_text(json.dumps({
+            'last_pk': self.resumes[2].pk,
+            'template_version': PDF_TEMPLATE_VERSION,
+            'output_mode': 'compact',
+            'filters': {'owner': None, 'updated_since': None, 'force': False},
+        }))
+        out, _ = self.prerender()
+        self.assertIn('Rendered 2 PDF(s)', out)
+        self.assertFalse(default_storage.exists(stored_pdf_name(self.resumes[0])))
+
+    def test_checkpoint_from_a_filtered_run_is_refused(self):
+        self.checkpoint.write_text(json.dumps({
+            'last_pk': self.resumes[2].pk,
+            'template_version': PDF_TEMPLATE_VERSION,
+            'output_mode': 'compact',
+            'filters': {'owner': 'jane', 'updated_since': None, 'force': False},
+        }))
+        with self.assertRaises(CommandError):
+            self.prerender()
+        out, _ = self.prerender(restart=True)
+        self.assertIn('Rendered 5 PDF(s)', out)
@@ -0,0 +1,178 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+
+# Defaults, overridable through settings.PDF_THROTTLE
+DEFAULT_PDF_THROTTLE = {
+    'RATE': 10,             # PDF downloads allowed per key ...
+    'PERIOD': 60,           # ... in each window of this many seconds
+    'MAX_CONCURRENT': 4,    # simultaneous PDF builds per process
+    'CACHE': 'default',     # cache alias holding the counters
+    'CACHE_PREFIX': 'pdf-throttle',
+    'SHARE_KEY': 'link',    # public share PDFs: 'link' or 'link+client' (see share_rate_key)
+    'CLIENT_IP_HEADER': 'REMOTE_ADDR',  # request.META key holding the client address
+    'TRUSTED_PROXIES': 1,   # proxies that appended to CLIENT_IP_HEADER
+}
+
+STAT_NAMES = ('allowed', 'throttled', 'rejected_busy', 'in_flight')
+
+_semaphore = None
+_semaphore_size = None
+_semaphore_lock = threading.Lock()
+
+
+class BuildSlotsBusy(Exception):
+    pass
+
+
+def get_throttle_config():
+    config = dict(DEFAULT_PDF_THROTTLE)
+    config.update(getattr(settings, 'PDF_THROTTLE', {}))
+    return config
+
+
+def _stat_key(config, name):
+    return f"{config['CACHE_PREFIX']}:stats:{name}"
+
+
+def _bump(name, amount=1):
+    # Counters live in the throttle cache so every worker adds to the same totals
+    config = get_throttle_config()
+    cache = caches[config['CACHE']]
+    key = _stat_key(config, name)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        if not cache.add(key, amount, None):
+            cache.incr(key, amount)
+
+
+def get_throttle_stats():
+    config = get_throttle_config()
+    keys = {_stat_key(config, name): name for name in STAT_NAMES}
+    values = caches[config['CACHE']].get_many(keys)
+    stats = {name: values.get(key, 0) for key, name in keys.items()}
+    # The build slot cap applies per process, unlike the counters above
+    stats['max_concurrent'] = config['MAX_CONCURRENT']
+    return stats
+
+
+def reset_throttle_stats():
+    config = get_throttle_config()
+    caches[config['CACHE']].delete_many([_stat_key(config, name) for name in STAT_NAMES])
+
+
+def _get_semaphore(size):
+    global _semaphore, _semaphore_size
+    with _semaphore_lock:
+        if _semaphore is None or _semaphore_size != size:
+            _semaphore = threading.BoundedSemaphore(size)
+            _semaphore_size = size
+        return _semaphore
+
+
+def take_token(key, config=None):
+    """Count one request against key's allowance for the current window.
+
+    Returns 0 when the request is admitted, otherwise the number of seconds
+    until the window resets. The counter is created with cache.add() and
+    bumped with cache.incr(), so concurrent requests can't both read the same
+    count. That holds only if the cache backend's incr() is atomic and shared
+    by all workers (Redis or Memcached), see CACHES in settings.
+
+    Windows are fixed, not sliding: a client can spend RATE at the end of one
+    window and RATE again at the start of the next, so up to 2 * RATE requests
+    can get through in any PERIOD seconds that span a boundary.
+    """
+    config = config or get_throttle_config()
+    cache = caches[config['CACHE']]
+    period = config['PERIOD']
+    now = time.time()
+    window = int(now // period)
+    cache_key = f"{config['CACHE_PREFIX']}:{key}:{window}"
+
+    cache.add(cache_key, 0, period + 1)
+    try:
+        count = cache.incr(cache_key)
+    except ValueError:
+        # The counter expired between add() and incr()
+        cache.add(cache_key, 1, period + 1)
+        count = 1
+    if count > config['RATE']:
+        return max(1, math.ceil((window + 1) * period - now))
+    return 0
+
+
+def client_address(request, config=None):
+    """Return the client address as seen by the outermost trusted proxy.
+
+    Proxies append to headers such as X-Forwarded-For, so only the last
+    TRUSTED_PROXIES entries were written by infrastructure we control; the
+    one furthest left of those is the address that connected to it.
+    """
+    config = config or get_throttle_config()
+    entries = [entry.strip() for entry in request.META.get(config['CLIENT_IP_HEADER'], '').split(',')]
+    return entries[-min(config['TRUSTED_PROXIES'], len(entries))]
+
+
+def share_rate_key(request, link):
+    """Rate limit key for a public share link download.
+
+    Behind a CDN every cache miss arrives from a handful of edge addresses, so
+    the default 'link' mode gives each link its own allowance. 'link+client'
+    also splits it by client_address(), which needs CLIENT_IP_HEADER and
+    TRUSTED_PROXIES to match the proxies in front of the site.
+    """
+    config = get_throttle_config()
+    if config['SHARE_KEY'] == 'link':
+        return f'share:{link.pk}'
+    if config['SHARE_KEY'] == 'link+client':
+        return f'share:{link.pk}:{client_address(request, config)}'
+    raise ImproperlyConfigured(
+        f"PDF_THROTTLE['SHARE_KEY'] must be 'link' or 'link+client', not {config['SHARE_KEY']!r}"
+    )
+
+
+def _too_many(status, retry_after, message):
+    response = HttpResponse(message, status=status, content_type='text/plain')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def check_rate_limit(key):
+    """Return a 429 response if key is over its PDF allowance, else None."""
+    retry_after = take_token(key)
+    if retry_after:
+        _bump('throttled')
+        return _too_many(429, retry_after, 'Too many PDF requests. Please try again shortly.')
+    _bump('allowed')
+    return None
+
+
+def busy_response():
+    return _too_many(503, 1, 'PDF generation is busy. Please try again shortly.')
+
+
+@contextmanager
+def pdf_build_slot():
+    """Hold one of MAX_CONCURRENT PDF build slots for this process.
+
+    Raises BuildSlotsBusy immediately instead of queueing when all slots are
+    taken, so callers can answer with busy_response().
+    """
+    semaphore = _get_semaphore(get_throttle_config()['MAX_CONCURRENT'])
+    if not semaphore.acquire(blocking=False):
+        _bump('rejected_busy')
+        raise BuildSlotsBusy()
+    _bump('in_flight')
+    try:
+        yield
+    finally:
+        _bump('in_flight', -1)
+        semaphore.release()
@@ -13,6 +13,13 @@ urlpatterns = [
     path('resumes/<int:pk>/update/', views.resume_update, name='resume_update'),
     path('resumes/<int:pk>/delete/', views.resume_delete, name='resume_delete'),
     path('resumes/<int:pk>/pdf/', views.generate_pdf, name='generate_pdf'),
+    path('resumes/<int:pk>/export/<str:fmt>/', views.export_resume, name='export_resume'),
+    path('resumes/export/<str:fmt>/', views.export_resumes, name='export_resumes'),
+    path('resumes/<int:pk>/share/', views.resume_share, name='resume_share'),
+    path('resumes/<int:pk>/share/<int:link_pk>/revoke/', views.share_revoke, name='share_revoke'),
+    path('share/<str:token>/', views.shared_resume, name='shared_resume'),
+    path('share/<str:token>/pdf/', views.shared_resume_pdf, name='shared_resume_pdf'),
+    path('monitoring/pdf-throttle/', views.pdf_throttle_stats, name='pdf_throttle_stats'),
     path('profile/', views.profile_view, name='profile'),
     path('profile/edit/', views.profile_edit, name='profile_edit'),
     path('profile/change-password/', views.change_password, name='change_password'),
@@ -1,20 +1,26 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.forms import UserCreationForm
-from django.contrib.auth import login, authenticate, update_session_auth_hash
+from django.contrib.auth import login, logout, update_session_auth_hash
 from django.contrib import messages
-from django.http import HttpResponse
-from django.template.loader import get_template
-from django.urls import reverse
-from io import BytesIO
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from .models import Resume, UserProfile
-from .forms import ResumeForm, UserProfileForm, CustomUserCreationForm, CustomUserChangeForm, CustomPasswordChangeForm
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse, Http404
+from django.db import transaction
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.template.loader import render_to_string
+from datetime import timedelta
+from .models import ActivityEvent, Resume, ShareLink, UserProfile
+from .forms import ResumeForm, UserProfileForm, CustomUserCreationForm, CustomUserChangeForm, CustomPasswordChangeForm, ShareLinkForm
+from .pdf import get_or_build_pdf, get_stored_pdf, pdf_etag, pdf_filename
+from .sections import RENDERER_VERSION
+from .exports import EXPORT_FORMATS, stream_resumes
+from .events import record_event
+from .accounts import request_account_deletion
+from .throttling import (
+    BuildSlotsBusy, busy_response, check_rate_limit, get_throttle_stats, pdf_build_slot, share_rate_key,
+)
 
 def home(request):
     if request.user.is_authenticated:
@@ -25,13 +31,13 @@ def signup(request):
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST)
         if form.is_valid():
-            user = form.save()
-            # Create user profile
-            UserProfile.objects.create(user=user)
+            # The profile is created by the post_save signal in the same transaction
+            with transaction.atomic():
+                user = form.save()
             username = form.cleaned_data.get('username')
-            raw_password = form.cleaned_data.get('password1')
-            user = authenticate(username=username, password=raw_password)
-            login(request, user)
+            # The password was just hashed by form.save(); log in directly
+            # instead of paying for a second hash in authenticate()
+            login(request, user, backend='django.contrib.auth.backends.ModelBackend')
             messages.success(request, f'Account created successfully for {username}!')
             return redirect('home')
     else:
@@ -51,6 +57,7 @@ def resume_create(request):
             resume = form.save(commit=False)
             resume.owner = request.user
             resume.save()
+            record_event(ActivityEvent.RESUME_CREATED, user=request.user, resume=resume)
             messages.success(request, 'Resume created successfully!')
             return redirect('resume_list')
     else:
@@ -64,6 +71,8 @@ def resume_update(request, pk):
         form = ResumeForm(request.POST, instance=resume)
         if form.is_valid():
             form.save()
+            record_event(ActivityEvent.RESUME_UPDATED, user=request.user, resume=resume,
+                         fields=form.changed_data)
             messages.success(request, 'Resume updated successfully!')
             return redirect('resume_list')
     else:
@@ -72,181 +81,182 @@ def resume_update(request, pk):
 
 @login_required
 def resume_detail(request, pk):
-    resume = get_object_or_404(Resume, pk=pk, owner=request.user)
-    return render(request, 'resumes/resume_detail.html', {'resume': resume})
+    resume = get_object_or_404(
+        Resume.objects.only('full_name', 'created_at', 'updated_at', 'rendered_html', 'render_version'),
+        pk=pk, owner=request.user,
+    )
+    if resume.html_is_stale:
+        resume = Resume.objects.get(pk=resume.pk)
+        resume.save(update_fields=['rendered_html', 'render_version'])
+    share_links = ShareLink.objects.filter(resume_id=resume.pk, revoked_at__isnull=True).order_by('-created_at')
+    return render(request, 'resumes/resume_detail.html', {
+        'resume': resume,
+        'share_links': [link for link in share_links if link.is_active],
+        'share_form': ShareLinkForm(),
+    })
 
 @login_required
 def resume_delete(request, pk):
     resume = get_object_or_404(Resume, pk=pk, owner=request.user)
     if request.method == 'POST':
+        record_event(ActivityEvent.RESUME_DELETED, user=request.user, resume=resume)
         resume.delete()
         messages.success(request, 'Resume deleted successfully!')
         return redirect('resume_list')
     return render(request, 'resumes/resume_confirm_delete.html', {'resume': resume})
 
+def _admitted_pdf(resume, rate_key):
+    """Return (pdf bytes, None) or (None, a 429/503 response) for an admitted download."""
+    rejected = check_rate_limit(rate_key)
+    if rejected is not None:
+        return None, rejected
+    data = get_stored_pdf(resume)
+    if data is None:
+        try:
+            with pdf_build_slot():
+                data = get_or_build_pdf(resume)
+        except BuildSlotsBusy:
+            return None, busy_response()
+    return data, None
+
 @login_required
 def generate_pdf(request, pk):
-    resume = get_object_or_404(Resume, pk=pk, owner=request.user)
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Title'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=1,  # Center alignment
-        textColor=colors.darkblue
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=12,
-        textColor=colors.darkblue,
-        fontName='Helvetica-Bold'
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=11,
-        spaceAfter=6,
-        leading=14
-    )
-    
-    story = []
-
-    # Header with name
-    story.append(Paragraph(resume.full_name, title_style))
-    story.append(Spacer(1, 20))
-
-    # Contact Information Section
-    contact_info = []
-    contact_info.append(f"Email: {resume.email}")
-    if resume.phone:
-        contact_info.append(f"Phone: {resume.phone}")
-    if resume.address:
-        contact_info.append(f"Address: {resume.address}")
-    
-    if contact_info:
-        story.append(Paragraph("Contact Information", heading_style))
-        for info in contact_info:
-            story.append(Paragraph(info, normal_style))
-        story.append(Spacer(1, 15))
-
-    # Online Presence
-    online_info = []
-    if resume.linkedin:
-        online_info.append(f"LinkedIn: {resume.linkedin}")
-    if resume.github:
-        online_info.append(f"GitHub: {resume.github}")
-    if resume.portfolio:
-        online_info.append(f"Portfolio: {resume.portfolio}")
-    
-    if online_info:
-        story.append(Paragraph("Online Presence", heading_style))
-        for info in online_info:
-            story.append(Paragraph(info, normal_style))
-        story.append(Spacer(1, 15))
-
-    # Professional Summary
-    if resume.summary:
-        story.append(Paragraph("Professional Summary", heading_style))
-        story.append(Paragraph(resume.summary, normal_style))
-        story.append(Spacer(1, 15))
-
-    # Skills Section
-    if resume.skills:
-        story.append(Paragraph("Skills", heading_style))
-        # Split skills by comma or newline and format nicely
-        skills_list = [skill.strip() for skill in resume.skills.replace('\n', ',').split(',') if skill.strip()]
-        skills_text = " • " + "\n • ".join(skills_list)
-        story.append(Paragraph(skills_text, normal_style))
-        story.append(Spacer(1, 15))
-
-    # Languages Section
-    if resume.languages:
-        story.append(Paragraph("Languages", heading_style))
-        # Handle multi-line language entries
-        language_lines = resume.languages.split('\n')
-        for line in language_lines:
-            if line.strip():
-                story.append(Paragraph(" • " + line.strip(), normal_style))
-        story.append(Spacer(1, 15))
-
-    # Work Experience
-    if resume.experience:
-        story.append(Paragraph("Work Experience", heading_style))
-        # Handle multi-line experience entries
-        experience_lines = resume.experience.split('\n')
-        for line in experience_lines:
-            if line.strip():
-                story.append(Paragraph(line.strip(), normal_style))
-        story.append(Spacer(1, 15))
-
-    # Education
-    if resume.education:
-        story.append(Paragraph("Education", heading_style))
-        # Handle multi-line education entries
-        education_lines = resume.education.split('\n')
-        for line in education_lines:
-            if line.strip():
-                story.append(Paragraph(line.strip(), normal_style))
-        story.append(Spacer(1, 15))
-
-    # Certifications
-    if resume.certifications:
-        story.append(Paragraph("Certifications", heading_style))
-        # Handle multi-line certification entries
-        cert_lines = resume.certifications.split('\n')
-        for line in cert_lines:
-            if line.strip():
-                story.append(Paragraph(" • " + line.strip(), normal_style))
-        story.append(Spacer(1, 15))
-
-    # Projects & Achievements
-    if resume.projects:
-        story.append(Paragraph("Projects & Achievements", heading_style))
-        # Handle multi-line project entries
-        project_lines = resume.projects.split('\n')
-        for line in project_lines:
-            if line.strip():
-                story.append(Paragraph(line.strip(), normal_style))
-        story.append(Spacer(1, 15))
-
-    # Interests & Hobbies
-    if resume.interests:
-        story.append(Paragraph("Interests & Hobbies", heading_style))
-        story.append(Paragraph(resume.interests, normal_style))
-        story.append(Spacer(1, 15))
-
-    # Professional References
-    if resume.references:
-        story.append(Paragraph("Professional References", heading_style))
-        # Handle multi-line reference entries
-        ref_lines = resume.references.split('\n')
-        for line in ref_lines:
-            if line.strip():
-                story.append(Paragraph(line.strip(), normal_style))
-
-    doc.build(story)
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{resume.full_name.replace(" ", "_")}_resume.pdf"'
+    resume = get_object_or_404(Resume.objects.defer('rendered_html'), pk=pk, owner=request.user)
+    etag = pdf_etag(resume)
+    # Revalidations are answered before admission control: they cost no build
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        data, rejected = _admitted_pdf(resume, f'user:{request.user.pk}')
+        if rejected is not None:
+            return rejected
+        record_event(ActivityEvent.PDF_DOWNLOADED, user=request.user, resume=resume)
+        response = HttpResponse(data, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{pdf_filename(resume)}"'
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, must_revalidate=True, max_age=settings.PDF_CACHE_MAX_AGE)
+    return response
+
+def _export_response(content, fmt, filename):
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[fmt][1])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
     return response
 
+@login_required
+def export_resume(request, pk, fmt):
+    if fmt not in EXPORT_FORMATS:
+        raise Http404('Unknown export format')
+    resume = get_object_or_404(Resume.objects.defer('rendered_html'), pk=pk, owner=request.user)
+    render_export = EXPORT_FORMATS[fmt][0]
+    return _export_response(render_export(resume), fmt, f'{resume.full_name.replace(" ", "_")}_resume')
+
+@login_required
+def export_resumes(request, fmt):
+    if fmt not in EXPORT_FORMATS:
+        raise Http404('Unknown export format')
+    resumes = Resume.objects.filter(owner=request.user).defer('rendered_html').order_by('pk').iterator(chunk_size=200)
+    return _export_response(stream_resumes(resumes, fmt), fmt, f'{request.user.username}_resumes')
+
+@login_required
+def resume_share(request, pk):
+    resume = get_object_or_404(Resume.objects.only('pk'), pk=pk, owner=request.user)
+    if request.method == 'POST':
+        form = ShareLinkForm(request.POST)
+        if form.is_valid():
+            expires_in = form.cleaned_data['expires_in']
+            expires_at = timezone.now() + timedelta(days=int(expires_in)) if expires_in else None
+            ShareLink.objects.create(resume=resume, expires_at=expires_at)
+            messages.success(request, 'Share link created successfully!')
+    return redirect('resume_detail', pk=pk)
+
+@login_required
+def share_revoke(request, pk, link_pk):
+    link = get_object_or_404(ShareLink, pk=link_pk, resume_id=pk, resume__owner=request.user)
+    if request.method == 'POST':
+        link.revoked_at = timezone.now()
+        link.save(update_fields=['revoked_at'])
+        messages.success(request, 'Share link revoked.')
+    return redirect('resume_detail', pk=pk)
+
+# The public share views never touch request.user, request.session or
+# messages, so the session and auth middleware do no database work and the
+# responses carry no Vary: Cookie. They can be cached by any shared cache.
+
+def _get_shared_link(token):
+    link_pk = ShareLink.pk_from_token(token)
+    if link_pk is None:
+        raise Http404('Invalid share link')
+    link = get_object_or_404(ShareLink.objects.select_related('resume__owner'), pk=link_pk)
+    if not link.is_active or not link.resume.owner.is_active:
+        raise Http404('Share link has expired or was revoked')
+    return link
+
+def _shared_response(request, link, etag, build_response):
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = build_response()
+        if response.status_code != 200:
+            # Throttling responses must not be cached
+            return response
+    # Revocation takes effect once cached copies expire, so keep max-age short
+    max_age = settings.SHARE_CACHE_MAX_AGE
+    if link.expires_at is not None:
+        max_age = max(0, min(max_age, int((link.expires_at - timezone.now()).total_seconds())))
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+def shared_resume(request, token):
+    link = _get_shared_link(token)
+    resume = link.resume
+    etag = f'"{resume.updated_at.timestamp():.6f}-html{RENDERER_VERSION}"'
+
+    def build_response():
+        if resume.html_is_stale:
+            resume.save(update_fields=['rendered_html', 'render_version'])
+        # Rendered without the request so no context processor reads the session
+        return HttpResponse(render_to_string('resumes/resume_shared.html', {'resume': resume, 'token': token}))
+
+    return _shared_response(request, link, etag, build_response)
+
+def shared_resume_pdf(request, token):
+    link = _get_shared_link(token)
+    resume = link.resume
+    etag = pdf_etag(resume)
+
+    def build_response():
+        data, rejected = _admitted_pdf(resume, share_rate_key(request, link))
+        if rejected is not None:
+            return rejected
+        record_event(ActivityEvent.PDF_DOWNLOADED, resume=resume, share_link=link.pk)
+        response = HttpResponse(data, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{pdf_filename(resume)}"'
+        return response
+
+    return _shared_response(request, link, etag, build_response)
+
+@staff_member_required
+def pdf_throttle_stats(request):
+    return JsonResponse(get_throttle_stats())
+
+def _get_user_profile(user):
+    # Profiles are created on signup; accounts that predate the signal fall back to get_or_create
+    try:
+        return user.userprofile
+    except UserProfile.DoesNotExist:
+        return UserProfile.objects.get_or_create(user=user)[0]
+
 @login_required
 def profile_view(request):
-    user_profile, created = UserProfile.objects.get_or_create(user=request.user)
-    return render(request, 'resumes/profile.html', {'user_profile': user_profile})
+    user_profile = _get_user_profile(request.user)
+    recent_activity = ActivityEvent.objects.filter(user=request.user).order_by('-created_at')[:10]
+    return render(request, 'resumes/profile.html', {
+        'user_profile': user_profile,
+        'recent_activity': recent_activity,
+    })
 
 @login_required
 def profile_edit(request):
-    user_profile, created = UserProfile.objects.get_or_create(user=request.user)
+    user_profile = _get_user_profile(request.user)
 
     if request.method == 'POST':
         user_form = CustomUserChangeForm(request.POST, instance=request.user)
@@ -273,6 +283,7 @@ def change_password(request):
         if form.is_valid():
             user = form.save()
             update_session_auth_hash(request, user)  # Important!
+            record_event(ActivityEvent.PASSWORD_CHANGED, user=user)
             messages.success(request, 'Your password was successfully updated!')
             return redirect('profile')
         else:
@@ -286,9 +297,11 @@ def delete_account(request):
     if request.method == 'POST':
         confirmation = request.POST.get('confirmation', '')
         if confirmation == 'DELETE':
-            # Delete the user account
+            # Deactivate now; resumes, files and the user row are purged in the background
             user = request.user
-            user.delete()
+            record_event(ActivityEvent.ACCOUNT_DELETED, user=user, username=user.username)
+            request_account_deletion(user)
+            logout(request)
             messages.success(request, 'Your account has been deleted successfully.')
             return redirect('home')
         else: